@@ -3,36 +3,41 @@ Configuration file for SmeHub API.
 Contains API keys, settings, and other configuration parameters.
 """
 
+import functools
 import os
+from dataclasses import dataclass, field
+from typing import Optional
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+@functools.cache
+def load_env() -> None:
+    """Load environment variables from .env file (only once per process)."""
+    load_dotenv()
 
+@dataclass(frozen=True)
 class Config:
     """Configuration class for API keys and settings."""
     
     # Claude Anthropic API configuration
-    CLAUDE_API_KEY = os.getenv('CLAUDE_API_KEY')
-    CLAUDE_MODEL = os.getenv('CLAUDE_MODEL', 'claude-3-5-sonnet-20241022')  # Default to Claude 3.5 Sonnet
-    CLAUDE_MAX_TOKENS = int(os.getenv('CLAUDE_MAX_TOKENS', '4000'))
+    CLAUDE_API_KEY: Optional[str] = field(default_factory=lambda: os.getenv('CLAUDE_API_KEY'))
+    CLAUDE_MODEL: str = field(default_factory=lambda: os.getenv('CLAUDE_MODEL', 'claude-3-5-sonnet-20241022'))  # Default to Claude 3.5 Sonnet
+    CLAUDE_MAX_TOKENS: int = field(default_factory=lambda: int(os.getenv('CLAUDE_MAX_TOKENS', '4000')))
     
     # Web search configuration
-    TAVILY_API_KEY = os.getenv('TAVILY_API_KEY')  # For web search capabilities
-    MAX_SEARCH_RESULTS = int(os.getenv('MAX_SEARCH_RESULTS', '5'))
+    TAVILY_API_KEY: Optional[str] = field(default_factory=lambda: os.getenv('TAVILY_API_KEY'))  # For web search capabilities
+    MAX_SEARCH_RESULTS: int = field(default_factory=lambda: int(os.getenv('MAX_SEARCH_RESULTS', '5')))
     
     # Report generation settings
-    REPORT_GENERATION_TIMEOUT = int(os.getenv('REPORT_GENERATION_TIMEOUT', '60'))  # seconds
+    REPORT_GENERATION_TIMEOUT: int = field(default_factory=lambda: int(os.getenv('REPORT_GENERATION_TIMEOUT', '60')))  # seconds
     
-    @classmethod
-    def validate_config(cls):
+    def validate_config(self):
         """Validate that required configuration is present."""
         errors = []
         
-        if not cls.CLAUDE_API_KEY:
+        if not self.CLAUDE_API_KEY:
             errors.append("CLAUDE_API_KEY is required")
         
-        if not cls.TAVILY_API_KEY:
+        if not self.TAVILY_API_KEY:
             errors.append("TAVILY_API_KEY is required for web search functionality")
         
         if errors:
@@ -40,5 +45,10 @@ class Config:
         
         return True
 
-# Create a global config instance
-config = Config()
+@functools.cache
+def get_config() -> Config:
+    """
+    Get the process-wide configuration, loading the .env file on first use.
+    """
+    load_env()
+    return Config()
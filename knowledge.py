@@ -1,3 +1,6 @@
+import csv
+import io
+
 postcode_meta = '''
 Column_Header,Description
 PCD,UK Postcode (frozen for 2011)
@@ -33,4 +36,8 @@ OA_SA_Townsend_Deprivation_Score,Townsend Deprivation Index score of Output Area
 OA_SA_Townsend_Deprivation_Quintile,Townsend Deprivation Index quintile of Output Area (OA) and Small Area
 '''
 
-
+# Parsed once at import so lookups don't need to re-tokenize the CSV text
+POSTCODE_META = {
+    row['Column_Header']: row['Description']
+    for row in csv.DictReader(io.StringIO(postcode_meta.strip()))
+}
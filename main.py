@@ -1,23 +1,25 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Dict, Any
 import os
-from dotenv import load_dotenv
+import asyncio
 from firebase_admin import firestore
-from datetime import datetime
 import logging
+from config import load_env
 from firebase_config import initialize_firebase
-from report_generator import generate_business_report_sync, BusinessInfo as ReportBusinessInfo
+from report_generator import generate_business_report, BusinessInfo, report_timestamp
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="SmeHub Report API",
     description="API for processing business report requests",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -41,12 +43,6 @@ else:
     logger.warning("Firebase not initialized - running in demo mode")
 
 # Pydantic models for request/response
-class BusinessInfo(BaseModel):
-    businessName: str
-    postalCode: str
-    country: str
-    industry: str
-
 class ReportRequest(BaseModel):
     reportId: str
     userId: str
@@ -59,22 +55,14 @@ class ReportResponse(BaseModel):
     reportId: str
 
 # Report processing function
-def report_processor(business_info: BusinessInfo, prompt: str) -> str:
+async def report_processor(business_info: BusinessInfo, prompt: str) -> str:
     """
     Process business information and generate a comprehensive report.
     Uses the report generation module to create the actual report content.
     """
     try:
-        # Convert the BusinessInfo to the report generator's BusinessInfo format
-        report_business_info = ReportBusinessInfo(
-            businessName=business_info.businessName,
-            postalCode=business_info.postalCode,
-            country=business_info.country,
-            industry=business_info.industry
-        )
-        
         # Generate the report using the separate module
-        generated_report = generate_business_report_sync(report_business_info, prompt)
+        generated_report = await generate_business_report(business_info, prompt)
         
         return generated_report
         
@@ -91,7 +79,7 @@ An error occurred while generating the report for {business_info.businessName}.
 Please try again or contact support if the issue persists.
 
 ---
-*Error logged on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
+*Error logged on {report_timestamp()}*
 """
 
 async def update_firestore_report(report_id: str, generated_report: str, status: str = "completed"):
@@ -104,7 +92,8 @@ async def update_firestore_report(report_id: str, generated_report: str, status:
     
     try:
         doc_ref = db.collection('reports').document(report_id)
-        doc_ref.update({
+        # Single terminal write, run off the event loop since the Firestore client is blocking
+        await asyncio.to_thread(doc_ref.update, {
             'generatedReport': generated_report,
             'status': status,
             'updatedAt': firestore.SERVER_TIMESTAMP,
@@ -125,36 +114,19 @@ async def root():
 async def health_check():
     return {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": report_timestamp(),
         "firebase_connected": db is not None
     }
 
-@app.post("/api/request-report", response_model=ReportResponse)
-async def process_report_request(request: ReportRequest):
+async def _do_generation(request: ReportRequest):
     """
-    Process a report request from the frontend.
+    Generate the report and store the outcome in Firestore.
+    Runs as a background task after the HTTP response has been sent.
     """
     try:
-        logger.info(f"Received report request for reportId: {request.reportId}")
-        
-        # Validate the request
-        if not request.reportId or not request.userId:
-            raise HTTPException(status_code=400, detail="Missing required fields: reportId or userId")
-        
-        # Update status to processing
-        if db:
-            try:
-                doc_ref = db.collection('reports').document(request.reportId)
-                doc_ref.update({
-                    'status': 'processing',
-                    'updatedAt': firestore.SERVER_TIMESTAMP
-                })
-            except Exception as e:
-                logger.warning(f"Could not update status to processing: {e}")
-        
         # Process the report using our report processor
-        logger.info("Starting report generation...")
-        generated_report = report_processor(request.businessInfo, request.finalPrompt)
+        logger.info(f"Starting report generation for reportId: {request.reportId}")
+        generated_report = await report_processor(request.businessInfo, request.finalPrompt)
         logger.info("Report generation completed")
         
         # Update Firestore with the generated report
@@ -163,14 +135,6 @@ async def process_report_request(request: ReportRequest):
         if not firestore_updated:
             logger.warning("Firestore update failed, but report was generated")
         
-        return ReportResponse(
-            success=True,
-            message="Report generated successfully",
-            reportId=request.reportId
-        )
-        
-    except HTTPException:
-        raise
     except Exception as e:
         logger.error(f"Error processing report request: {e}")
         
@@ -178,15 +142,45 @@ async def process_report_request(request: ReportRequest):
         if db:
             try:
                 doc_ref = db.collection('reports').document(request.reportId)
-                doc_ref.update({
+                await asyncio.to_thread(doc_ref.update, {
                     'status': 'failed',
                     'error': str(e),
                     'updatedAt': firestore.SERVER_TIMESTAMP
                 })
             except Exception as update_error:
                 logger.error(f"Could not update status to failed: {update_error}")
-        
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@app.post("/api/request-report", response_model=ReportResponse)
+async def process_report_request(request: ReportRequest, background_tasks: BackgroundTasks):
+    """
+    Queue a report request from the frontend.
+    The report is generated in the background; poll the Firestore document for its status.
+    """
+    logger.info(f"Received report request for reportId: {request.reportId}")
+    
+    # Validate the request
+    if not request.reportId or not request.userId:
+        raise HTTPException(status_code=400, detail="Missing required fields: reportId or userId")
+    
+    # Mark the report as picked up before queueing, so a job lost with its
+    # instance can be told apart from one that was never received
+    if db:
+        try:
+            doc_ref = db.collection('reports').document(request.reportId)
+            await asyncio.to_thread(doc_ref.update, {
+                'status': 'processing',
+                'updatedAt': firestore.SERVER_TIMESTAMP
+            })
+        except Exception as e:
+            logger.warning(f"Could not update status to processing: {e}")
+    
+    background_tasks.add_task(_do_generation, request)
+    
+    return ReportResponse(
+        success=True,
+        message="Report queued",
+        reportId=request.reportId
+    )
 
 if __name__ == "__main__":
     import uvicorn
@@ -4,18 +4,17 @@ Contains the core logic for generating business reports.
 """
 
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 import asyncio
-from typing import List, Dict, Any
+import functools
+import heapq
+from operator import attrgetter
+from typing import List, NamedTuple, Tuple
 import json
 
-# Import Claude and web search libraries
-from anthropic import Anthropic
-from tavily import TavilyClient
-
 # Import configuration
-from config import config
+from config import get_config
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +24,80 @@ class BusinessInfo(BaseModel):
     country: str
     industry: str
 
+class SearchHit(NamedTuple):
+    title: str
+    content: str
+    url: str
+    score: float
+
+def report_timestamp() -> str:
+    """
+    Current UTC time as an ISO 8601 string, used for report and API timestamps.
+    """
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+@functools.lru_cache(maxsize=1)
+def _validated() -> bool:
+    """
+    Validate the configuration once per process; settings can't change after start-up.
+    Failures raise and are therefore not cached.
+    """
+    return get_config().validate_config()
+
+# Tavily REST endpoint, called directly so requests share one HTTP/2 connection pool
+_TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+def _http_limits():
+    """
+    Connection pool limits shared by the Claude and Tavily HTTP clients.
+    """
+    import httpx
+    
+    return httpx.Limits(max_keepalive_connections=20, keepalive_expiry=300)
+
+class _TavilySearchClient:
+    """
+    Minimal async Tavily search client backed by a persistent HTTP/2 connection pool.
+    Mirrors the TavilyClient.search call used by this module.
+    """
+    
+    def __init__(self, api_key: str):
+        import httpx
+        
+        self._api_key = api_key
+        self._http = httpx.AsyncClient(http2=True, limits=_http_limits(), timeout=60)
+    
+    async def search(self, query: str, search_depth: str = "basic", max_results: int = 5) -> dict:
+        response = await self._http.post(_TAVILY_SEARCH_URL, json={
+            "api_key": self._api_key,
+            "query": query,
+            "search_depth": search_depth,
+            "max_results": max_results
+        })
+        response.raise_for_status()
+        return response.json()
+
+@functools.lru_cache(maxsize=1)
+def _claude():
+    """
+    Get the shared async Claude client so its HTTP connection pool is reused across requests.
+    """
+    # Import lazily so the SDK isn't loaded on worker start-up
+    from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+    
+    # Keep the SDK's default client settings, overriding only HTTP/2 and pool limits
+    return AsyncAnthropic(
+        api_key=get_config().CLAUDE_API_KEY,
+        http_client=DefaultAsyncHttpxClient(http2=True, limits=_http_limits())
+    )
+
+@functools.lru_cache(maxsize=1)
+def _tavily() -> _TavilySearchClient:
+    """
+    Get the shared Tavily client so its HTTP connection pool is reused across requests.
+    """
+    return _TavilySearchClient(api_key=get_config().TAVILY_API_KEY)
+
 async def generate_business_report(business_info: BusinessInfo, prompt: str) -> str:
     """
     Generate a business report based on the provided business information and prompt.
@@ -41,7 +114,7 @@ async def generate_business_report(business_info: BusinessInfo, prompt: str) ->
     
     try:
         # Validate configuration
-        config.validate_config()
+        _validated()
         
         # Perform web search for market intelligence
         search_results = await _perform_web_search(business_info, prompt)
@@ -58,99 +131,10 @@ async def generate_business_report(business_info: BusinessInfo, prompt: str) ->
         logger.info("Falling back to basic report generation")
         return _create_fallback_report(business_info, prompt, str(e))
 
-def generate_business_report_sync(business_info: BusinessInfo, prompt: str) -> str:
-    """
-    Synchronous wrapper for the async report generation function.
-    """
-    return asyncio.run(generate_business_report(business_info, prompt))
+# Number of search results kept per query, ranked by Tavily score
+_TOP_RESULTS_PER_QUERY = 3
 
-def _create_enhanced_report(business_info: BusinessInfo, prompt: str) -> str:
-    """
-    Private function to create the report content.
-    This is where you'll add the actual AI integration.
-    """
-    
-    # Enhanced dummy report with better structure
-    # TODO: Replace with actual AI-generated content
-    report = f"""
-# Comprehensive Business Report for {business_info.businessName}
-
-## Executive Summary
-This report has been generated based on your specific requirements and business profile.
-
-## Company Profile
-- **Business Name**: {business_info.businessName}
-- **Location**: {business_info.postalCode}, {business_info.country}
-- **Industry Sector**: {business_info.industry}
-
-## Request Analysis
-**Your Request**: "{prompt}"
-
-## Market Analysis
-Based on your location in {business_info.country} and your operation in the {business_info.industry} sector, here are key insights:
-
-### Industry Overview
-- The {business_info.industry} sector shows various opportunities and challenges
-- Location-specific factors in {business_info.country} may impact operations
-- Market conditions should be monitored regularly
-
-### Regional Considerations
-- Operating in {business_info.postalCode} area
-- Local market dynamics in {business_info.country}
-- Regulatory environment considerations
-
-## Strategic Recommendations
-
-### Short-term Actions
-1. Assess current market position in the {business_info.industry} sector
-2. Evaluate local competition in {business_info.country}
-3. Review operational efficiency measures
-
-### Long-term Strategy
-1. Consider expansion opportunities within {business_info.industry}
-2. Develop market presence in {business_info.country}
-3. Build sustainable competitive advantages
-
-## Implementation Roadmap
-
-### Phase 1: Assessment (Months 1-2)
-- Market research and analysis
-- Competitive landscape evaluation
-- Internal capability assessment
-
-### Phase 2: Strategy Development (Months 3-4)
-- Strategic planning based on findings
-- Resource allocation planning
-- Risk assessment and mitigation
-
-### Phase 3: Execution (Months 5-12)
-- Implementation of strategic initiatives
-- Performance monitoring and adjustment
-- Continuous improvement processes
-
-## Risk Assessment
-- Industry-specific risks in {business_info.industry}
-- Regional risks in {business_info.country}
-- Operational risk factors
-
-## Conclusion
-This report provides a foundation for strategic decision-making for {business_info.businessName}. 
-The analysis considers your specific industry context and geographical location to provide 
-relevant insights and recommendations.
-
-## Next Steps
-1. Review recommendations with your team
-2. Prioritize implementation actions
-3. Establish monitoring and review processes
-
----
-*Report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
-*This is a template report. Replace with AI-generated content for production use.*
-"""
-    
-    return report.strip()
-
-async def _perform_web_search(business_info: BusinessInfo, prompt: str) -> List[Dict[str, Any]]:
+async def _perform_web_search(business_info: BusinessInfo, prompt: str) -> List[Tuple[str, List[SearchHit]]]:
     """
     Perform web search to gather market intelligence and current information.
     
@@ -159,83 +143,108 @@ async def _perform_web_search(business_info: BusinessInfo, prompt: str) -> List[
         prompt: User's specific request
         
     Returns:
-        List of search results with relevant market data
+        (query, hits) pairs with relevant market data, in query order
     """
     try:
-        # Initialize Tavily client
-        tavily_client = TavilyClient(api_key=config.TAVILY_API_KEY)
+        config = get_config()
+        tavily_client = _tavily()
         
         # Construct search queries based on business info and prompt
         search_queries = _build_search_queries(business_info, prompt)
         
-        all_results = []
-        
+        # Run all queries concurrently over the shared async HTTP/2 client
         for query in search_queries:
             logger.info(f"Searching for: {query}")
-            
-            # Perform search
-            search_response = tavily_client.search(
-                query=query,
-                search_depth="advanced",
-                max_results=config.MAX_SEARCH_RESULTS
-            )
+        
+        search_responses = await asyncio.gather(
+            *(
+                tavily_client.search(
+                    query=query,
+                    search_depth="advanced",
+                    max_results=config.MAX_SEARCH_RESULTS
+                )
+                for query in search_queries
+            ),
+            return_exceptions=True
+        )
+        
+        grouped_results = []
+        
+        for query, search_response in zip(search_queries, search_responses):
+            # A failed query shouldn't discard the results of the others
+            if isinstance(search_response, Exception):
+                logger.warning(f"Search failed for '{query}': {str(search_response)}")
+                continue
             
             # Extract useful information from search results
-            if search_response and 'results' in search_response:
+            if search_response and search_response.get('results'):
+                hits_for_query = []
                 for result in search_response['results']:
-                    all_results.append({
-                        'title': result.get('title', ''),
-                        'content': result.get('content', ''),
-                        'url': result.get('url', ''),
-                        'score': result.get('score', 0),
-                        'query': query
-                    })
+                    # Hits without content never reach the prompt, so don't let them take a top slot
+                    if not result.get('content'):
+                        continue
+                    
+                    # Truncate at ingestion so only what reaches the prompt is kept in memory
+                    hits_for_query.append(SearchHit(
+                        title=(result.get('title') or '')[:200],
+                        content=(result.get('content') or '')[:500],
+                        url=result.get('url') or '',
+                        score=result.get('score') or 0
+                    ))
+                
+                # Only the best-scoring hits per query are passed on to Claude
+                if hits_for_query:
+                    top_hits = heapq.nlargest(_TOP_RESULTS_PER_QUERY, hits_for_query, key=attrgetter('score'))
+                    grouped_results.append((query, top_hits))
         
-        logger.info(f"Found {len(all_results)} search results")
-        return all_results
+        logger.info(f"Found {sum(len(hits) for _, hits in grouped_results)} search results")
+        return grouped_results
         
     except Exception as e:
         logger.error(f"Web search failed: {str(e)}")
         return []
 
+# Orthogonal search queries: market/competition and regulation. Each query
+# costs a Tavily call and adds to the Claude prompt, so overlapping variants
+# are deliberately left out.
+_SEARCH_QUERY_TEMPLATES = (
+    "{industry} industry trends and competitors 2024 {country}",
+    "regulations {industry} {country}",
+)
+_PROMPT_QUERY_TEMPLATE = "{prompt} {industry} {country}"
+
 def _build_search_queries(business_info: BusinessInfo, prompt: str) -> List[str]:
     """
     Build targeted search queries based on business information and user prompt.
     """
-    queries = []
+    industry = business_info.industry
+    country = business_info.country
     
-    # Industry-specific queries
-    queries.append(f"{business_info.industry} industry trends 2024 {business_info.country}")
-    queries.append(f"{business_info.industry} market analysis {business_info.country}")
-    
-    # Location-specific queries
-    queries.append(f"business environment {business_info.country} {business_info.industry}")
-    queries.append(f"regulations {business_info.industry} {business_info.country}")
+    queries = [template.format(industry=industry, country=country, prompt=prompt)
+               for template in _SEARCH_QUERY_TEMPLATES]
     
     # Prompt-specific query
     if prompt:
-        queries.append(f"{prompt} {business_info.industry} {business_info.country}")
-    
-    # Competitive landscape
-    queries.append(f"competitors {business_info.industry} {business_info.country}")
+        queries.append(_PROMPT_QUERY_TEMPLATE.format(industry=industry, country=country, prompt=prompt))
     
-    return queries
+    # Drop duplicates while keeping the original order
+    return list(dict.fromkeys(queries))
 
-async def _generate_claude_report(business_info: BusinessInfo, prompt: str, search_results: List[Dict[str, Any]]) -> str:
+async def _generate_claude_report(business_info: BusinessInfo, prompt: str, search_results: List[Tuple[str, List[SearchHit]]]) -> str:
     """
     Generate a comprehensive business report using Claude AI with search data.
     
     Args:
         business_info: Business information
         prompt: User's specific request
-        search_results: Web search results for context
+        search_results: Web search results for context, grouped by query
         
     Returns:
         AI-generated business report
     """
     try:
-        # Initialize Claude client
-        claude_client = Anthropic(api_key=config.CLAUDE_API_KEY)
+        config = get_config()
+        claude_client = _claude()
         
         # Prepare context from search results
         search_context = _prepare_search_context(search_results)
@@ -245,8 +254,8 @@ async def _generate_claude_report(business_info: BusinessInfo, prompt: str, sear
         
         logger.info("Generating report with Claude AI")
         
-        # Generate report using Claude
-        response = claude_client.messages.create(
+        # Stream the report from Claude so the event loop stays free while tokens are generated
+        async with claude_client.messages.stream(
             model=config.CLAUDE_MODEL,
             max_tokens=config.CLAUDE_MAX_TOKENS,
             temperature=0.7,
@@ -256,10 +265,8 @@ async def _generate_claude_report(business_info: BusinessInfo, prompt: str, sear
                     "content": claude_prompt
                 }
             ]
-        )
-        
-        # Extract and return the generated report
-        report_content = response.content[0].text
+        ) as stream:
+            report_content = await stream.get_final_text()
         
         logger.info("Claude AI report generation successful")
         return report_content
@@ -268,46 +275,38 @@ async def _generate_claude_report(business_info: BusinessInfo, prompt: str, sear
         logger.error(f"Claude AI generation failed: {str(e)}")
         raise
 
-def _prepare_search_context(search_results: List[Dict[str, Any]]) -> str:
+def _prepare_search_context(search_results: List[Tuple[str, List[SearchHit]]]) -> str:
     """
     Prepare search results as context for Claude AI.
     """
     if not search_results:
         return "No current market data available."
     
-    context_parts = []
-    
-    # Group results by query for better organization
-    query_groups = {}
-    for result in search_results:
-        query = result.get('query', 'general')
-        if query not in query_groups:
-            query_groups[query] = []
-        query_groups[query].append(result)
-    
-    for query, results in query_groups.items():
-        context_parts.append(f"\n=== Search Results for: {query} ===")
-        
-        for result in results[:3]:  # Limit to top 3 results per query
-            if result.get('content'):
-                context_parts.append(f"Title: {result.get('title', 'N/A')}")
-                context_parts.append(f"Content: {result.get('content', '')[:500]}...")  # Limit content length
-                context_parts.append(f"Source: {result.get('url', 'N/A')}")
-                context_parts.append("---")
-    
-    return "\n".join(context_parts)
+    # Results arrive already grouped by query, so no regrouping is needed
+    return "\n".join(_iter_context_blocks(search_results))
 
-def _build_claude_prompt(business_info: BusinessInfo, user_prompt: str, search_context: str) -> str:
+def _iter_context_blocks(search_results: List[Tuple[str, List[SearchHit]]]):
     """
-    Build a comprehensive prompt for Claude AI.
+    Yield one formatted block per query header and per search result.
     """
-    return f"""
+    for query, results in search_results:
+        yield f"\n=== Search Results for: {query} ==="
+        
+        for result in results:
+            yield (
+                f"Title: {result.title}\n"
+                f"Content: {result.content}...\n"
+                f"Source: {result.url}\n"
+                "---"
+            )
+
+_CLAUDE_PROMPT_TMPL = """
 You are a senior business analyst tasked with creating a comprehensive business report. Use the provided information to generate a detailed, professional report.
 
 BUSINESS INFORMATION:
-- Company Name: {business_info.businessName}
-- Location: {business_info.postalCode}, {business_info.country}
-- Industry: {business_info.industry}
+- Company Name: {businessName}
+- Location: {postalCode}, {country}
+- Industry: {industry}
 
 USER REQUEST:
 {user_prompt}
@@ -339,21 +338,30 @@ REPORT STRUCTURE:
 Generate a detailed, professional report that provides real value to the business owner.
 """
 
-def _create_fallback_report(business_info: BusinessInfo, prompt: str, error_message: str) -> str:
+def _build_claude_prompt(business_info: BusinessInfo, user_prompt: str, search_context: str) -> str:
     """
-    Create a fallback report when AI generation fails.
+    Build a comprehensive prompt for Claude AI.
     """
-    return f"""
-# Business Report for {business_info.businessName}
+    return _CLAUDE_PROMPT_TMPL.format_map({
+        "businessName": business_info.businessName,
+        "postalCode": business_info.postalCode,
+        "country": business_info.country,
+        "industry": business_info.industry,
+        "user_prompt": user_prompt,
+        "search_context": search_context
+    })
+
+_FALLBACK_REPORT_TMPL = """
+# Business Report for {businessName}
 
 ## Notice
 This report was generated using a fallback method due to a technical issue with the AI service.
 Error: {error_message}
 
 ## Company Profile
-- **Business Name**: {business_info.businessName}
-- **Location**: {business_info.postalCode}, {business_info.country}
-- **Industry**: {business_info.industry}
+- **Business Name**: {businessName}
+- **Location**: {postalCode}, {country}
+- **Industry**: {industry}
 
 ## User Request
 {prompt}
@@ -362,11 +370,11 @@ Error: {error_message}
 This is a basic report template. For a comprehensive AI-powered analysis with current market data, please ensure your API configuration is correct and try again.
 
 ### Industry Context
-Your business operates in the {business_info.industry} sector in {business_info.country}. 
+Your business operates in the {industry} sector in {country}. 
 
 ### Recommendations
-1. Review your market position within the {business_info.industry} industry
-2. Analyze local competition in {business_info.country}
+1. Review your market position within the {industry} industry
+2. Analyze local competition in {country}
 3. Consider current market trends affecting your sector
 4. Evaluate opportunities for growth and expansion
 
@@ -376,6 +384,20 @@ Your business operates in the {business_info.industry} sector in {business_info.
 3. Retry report generation once technical issues are resolved
 
 ---
-*Fallback report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
+*Fallback report generated on {generated_at}*
 *For full AI-powered analysis, please resolve the technical issue and regenerate the report.*
 """
+
+def _create_fallback_report(business_info: BusinessInfo, prompt: str, error_message: str) -> str:
+    """
+    Create a fallback report when AI generation fails.
+    """
+    return _FALLBACK_REPORT_TMPL.format_map({
+        "businessName": business_info.businessName,
+        "postalCode": business_info.postalCode,
+        "country": business_info.country,
+        "industry": business_info.industry,
+        "prompt": prompt,
+        "error_message": error_message,
+        "generated_at": report_timestamp()
+    })
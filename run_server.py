@@ -5,11 +5,11 @@ Simple script to run the FastAPI server with proper configuration.
 
 import uvicorn
 import os
-from dotenv import load_dotenv
+from config import load_env
 
 def main():
     # Load environment variables
-    load_dotenv()
+    load_env()
     
     # Get configuration from environment or use defaults
     host = os.getenv("HOST", "0.0.0.0")